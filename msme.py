@@ -1,438 +1,632 @@
-
-from datetime import datetime
-import io
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import streamlit as st
-
-
-# PAGE CONFIG
-
-
-st.set_page_config(
-    page_title="MSME Loan Portfolio Dashboard",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded",
-)
-
-
-
-# METRICS
-
-def calculate_metrics(df: pd.DataFrame) -> dict:
-    total = len(df)
-    metrics = {
-        "total_customers": total,
-        "regular_customers": int((df["status"] == "Regular").sum()),
-        "monitored_customers": int((df["status"] == "Monitored").sum()),
-        "upcoming_npa_customers": int((df["status"] == "Upcoming_NPA").sum()),
-        "current_npa_customers": int((df["status"] == "Current_NPA").sum()),
-        "unclassified_customers": int((df["status"] == "Unclassified").sum()),
-    }
-
-    metrics["current_npa_pct"] = (
-        metrics["current_npa_customers"] / total * 100 if total else 0.0
-    )
-    metrics["upcoming_npa_pct"] = (
-        metrics["upcoming_npa_customers"] / total * 100 if total else 0.0
-    )
-    metrics["regular_payer_pct"] = (
-        metrics["regular_customers"] / total * 100 if total else 0.0
-    )
-
-    metrics["digital_customers"] = int((df["payment_method"] == "Digital").sum())
-    metrics["digital_adoption_pct"] = (
-        metrics["digital_customers"] / total * 100 if total else 0.0
-    )
-
-    metrics["visit_covered_customers"] = int(df["visit_covered"].sum())
-    metrics["visit_coverage_pct"] = (
-        metrics["visit_covered_customers"] / total * 100 if total else 0.0
-    )
-
-    metrics["total_loan_amount"] = float(df["loan_amount"].sum()) if total else 0.0
-    metrics["avg_loan_amount"] = float(df["loan_amount"].mean()) if total else 0.0
-
-    npa_rate = metrics["current_npa_pct"]
-    upcoming_npa_rate = metrics["upcoming_npa_pct"]
-    dpd_coverage_eff = metrics["visit_coverage_pct"]
-    collection_coverage = metrics["visit_coverage_pct"]
-
-    risk_score = (
-        (npa_rate / 100) * 40
-        + (upcoming_npa_rate / 100) * 60
-        + (100 - dpd_coverage_eff) / 100 * 15
-        + (100 - collection_coverage) / 100 * 15
-    )
-    metrics["risk_score"] = min(max(risk_score, 0), 100)
-
-    return metrics
-
-
-
-# PLOTS
-
-def plot_portfolio_composition(df: pd.DataFrame):
-    comp = (
-        df["segment"]
-        .value_counts()
-        .reindex(
-            ["Healthy", "Monitored", "Upcoming_NPA", "Current_NPA", "Unclassified"],
-            fill_value=0,
-        )
-        .reset_index()
-    )
-    comp.columns = ["segment", "customers"]
-    comp["percentage"] = comp["customers"] / comp["customers"].sum() * 100
-
-    fig = px.bar(
-        comp,
-        x="segment",
-        y="customers",
-        text=comp["percentage"].map(lambda x: f"{x:.1f}%"),
-        title="Portfolio Composition by Segment",
-        labels={"segment": "Segment", "customers": "Customers"},
-        color="segment",
-        color_discrete_map={
-            "Healthy": "#2ecc71",
-            "Monitored": "#f1c40f",
-            "Upcoming_NPA": "#e67e22",
-            "Current_NPA": "#e74c3c",
-            "Unclassified": "#95a5a6",
-        },
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-def plot_risk_zones(df: pd.DataFrame):
-    def zone(s):
-        if s == "Regular":
-            return "Green"
-        if s == "Monitored":
-            return "Yellow"
-        if s == "Upcoming_NPA":
-            return "Orange"
-        if s == "Current_NPA":
-            return "Red"
-        return "Unclassified"
-
-    temp = df.copy()
-    temp["risk_zone"] = temp["status"].apply(zone)
-    agg = temp["risk_zone"].value_counts().reset_index()
-    agg.columns = ["risk_zone", "customers"]
-
-    fig = px.pie(
-        agg,
-        names="risk_zone",
-        values="customers",
-        title="Risk Zone Distribution",
-        color="risk_zone",
-        color_discrete_map={
-            "Green": "#2ecc71",
-            "Yellow": "#f1c40f",
-            "Orange": "#e67e22",
-            "Red": "#e74c3c",
-            "Unclassified": "#95a5a6",
-        },
-        hole=0.4,
-    )
-    fig.update_layout(height=400)
-    return fig
-
-
-def plot_profession_repayment(df: pd.DataFrame):
-    temp = df.copy()
-    temp["paid_flag"] = temp["payment_regular"].astype(int)
-    stats = temp.groupby("profession")["paid_flag"].mean().reset_index()
-    stats["payment_rate_pct"] = stats["paid_flag"] * 100
-
-    fig = px.bar(
-        stats,
-        x="profession",
-        y="payment_rate_pct",
-        title="Repayment Performance by Profession",
-        labels={"profession": "Profession", "payment_rate_pct": "Payment Rate (%)"},
-        color="payment_rate_pct",
-        color_continuous_scale="RdYlGn",
-    )
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-def plot_payment_method_mix(df: pd.DataFrame):
-    dist = df["payment_method"].value_counts().reset_index()
-    dist.columns = ["payment_method", "customers"]
-    dist["percentage"] = dist["customers"] / dist["customers"].sum() * 100
-
-    fig = px.bar(
-        dist,
-        x="payment_method",
-        y="customers",
-        text=dist["percentage"].map(lambda x: f"{x:.1f}%"),
-        title="Payment Method Mix (Cash vs Digital)",
-        labels={"payment_method": "Payment Method", "customers": "Customers"},
-        color="payment_method",
-        color_discrete_map={"Cash": "#e67e22", "Digital": "#3498db"},
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-def plot_dpd_distribution(df: pd.DataFrame):
-    fig = px.histogram(
-        df,
-        x="dpd",
-        nbins=30,
-        title="DPD (Days Past Due) Distribution",
-        labels={"dpd": "Days Past Due"},
-        color_discrete_sequence=["#9b59b6"],
-    )
-    fig.update_layout(height=400, yaxis_title="Customers")
-    return fig
-
-
-def plot_emi_vs_loan(df: pd.DataFrame):
-    fig = px.scatter(
-        df,
-        x="paid_emis",
-        y="loan_amount",
-        color="status",
-        size="emi_amount",
-        title="EMI Collection vs Loan Amount",
-        labels={"paid_emis": "EMIs Paid", "loan_amount": "Loan Amount (₹)"},
-        color_discrete_map={
-            "Regular": "#2ecc71",
-            "Monitored": "#f1c40f",
-            "Upcoming_NPA": "#e67e22",
-            "Current_NPA": "#e74c3c",
-            "Unclassified": "#95a5a6",
-        },
-    )
-    fig.update_layout(height=400)
-    return fig
-
-
-def plot_risk_score_gauge(risk_score: float):
-    fig = go.Figure(
-        go.Indicator(
-            mode="gauge+number",
-            value=risk_score,
-            title={"text": "Portfolio Risk Score"},
-            domain={"x": [0, 1], "y": [0, 1]},
-            gauge={
-                "axis": {"range": [0, 100]},
-                "bar": {"color": "darkblue"},
-                "steps": [
-                    {"range": [0, 30], "color": "#2ecc71"},
-                    {"range": [30, 60], "color": "#f1c40f"},
-                    {"range": [60, 100], "color": "#e74c3c"},
-                ],
-                "threshold": {
-                    "line": {"color": "red", "width": 4},
-                    "thickness": 0.75,
-                    "value": 47.5,
-                },
-            },
-        )
-    )
-    fig.update_layout(height=400)
-    return fig
-
-
-def plot_legal_vs_segment(df: pd.DataFrame):
-    temp = df.copy()
-    temp["segment_group"] = temp["status"].replace(
-        {
-            "Regular": "Regular",
-            "Monitored": "Monitored",
-            "Upcoming_NPA": "Upcoming NPA",
-            "Current_NPA": "Current NPA",
-            "Unclassified": "Unclassified",
-        }
-    )
-    agg = temp.groupby("segment_group")["got_legal_notice"].mean().reset_index()
-    agg["legal_notice_pct"] = agg["got_legal_notice"] * 100
-
-    fig = px.bar(
-        agg,
-        x="segment_group",
-        y="legal_notice_pct",
-        title="Legal Notice Coverage by Segment",
-        labels={"segment_group": "Segment", "legal_notice_pct": "With Legal Notice (%)"},
-        color="legal_notice_pct",
-        color_continuous_scale="Blues",
-    )
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-def plot_visit_coverage(df: pd.DataFrame):
-    temp = df.copy()
-    temp["segment_group"] = temp["status"].replace(
-        {
-            "Regular": "Regular",
-            "Monitored": "Monitored",
-            "Upcoming_NPA": "Upcoming NPA",
-            "Current_NPA": "Current NPA",
-            "Unclassified": "Unclassified",
-        }
-    )
-    agg = temp.groupby("segment_group")["visit_covered"].mean().reset_index()
-    agg["visit_coverage_pct"] = agg["visit_covered"] * 100
-
-    fig = px.bar(
-        agg,
-        x="segment_group",
-        y="visit_coverage_pct",
-        title="Collection Visit Coverage by Segment",
-        labels={"segment_group": "Segment", "visit_coverage_pct": "Visit Coverage (%)"},
-        color="visit_coverage_pct",
-        color_continuous_scale="Greens",
-    )
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-def plot_irregular_reasons(df: pd.DataFrame):
-    temp = df[df["irregular_reason"] != "None"].copy()
-    if temp.empty:
-        return go.Figure()
-
-    agg = temp["irregular_reason"].value_counts().reset_index()
-    agg.columns = ["reason", "cases"]
-    agg["percentage"] = agg["cases"] / agg["cases"].sum() * 100
-
-    fig = px.bar(
-        agg,
-        x="reason",
-        y="cases",
-        text=agg["percentage"].map(lambda x: f"{x:.1f}%"),
-        title="Irregular Payment Reasons",
-        labels={"reason": "Reason", "cases": "Number of Cases"},
-        color="reason",
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=400, showlegend=False)
-    return fig
-
-
-
-# MAIN
-
-def main():
-    st.sidebar.title("📁 Data Source")
-
-    uploaded = st.sidebar.file_uploader(
-        "Upload MSME portfolio CSV ",
-        type=["csv"],
-    )
-    st.sidebar.link_button("Download Dataset from GitHub", "https://github.com/krishnachandan2412/MSME_Loan_Portfolio/blob/main/msme_loan_portfolio.csv")
-    if uploaded is None:
-        st.warning("Please upload a CSV file to view the dashboard.")
-        st.stop()
-
-    # Row slider in sidebar
-    temp_df = pd.read_csv(uploaded)
-    max_rows = len(temp_df)
-    row_limit = st.sidebar.slider(
-        "Rows to use for analysis",
-        min_value=100 if max_rows >= 100 else 1,
-        max_value=max_rows,
-        value=max_rows,
-        step=50 if max_rows >= 150 else 1,
-    )
-    df = temp_df.head(row_limit)
-    st.sidebar.info(f"Using first {row_limit} rows out of {max_rows}")
-
-    metrics = calculate_metrics(df)
-
-    st.title("📊 MSME Loan Portfolio - Executive Dashboard")
-    st.write(
-        f"Report generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    )
-
-    st.subheader("Key Performance Indicators")
-    k1, k2, k3, k4, k5, k6, k7 = st.columns(7)
-    with k1:
-        st.metric("Total Customers", f"{metrics['total_customers']}")
-    with k2:
-        st.metric("Regular Payers", f"{metrics['regular_payer_pct']:.1f}%")
-    with k3:
-        st.metric("Current NPA %", f"{metrics['current_npa_pct']:.1f}%")
-    with k4:
-        st.metric("Upcoming NPA %", f"{metrics['upcoming_npa_pct']:.1f}%")
-    with k5:
-        st.metric("Visit Coverage", f"{metrics['visit_coverage_pct']:.1f}%")
-    with k6:
-        st.metric("Digital Adoption", f"{metrics['digital_adoption_pct']:.1f}%")
-    with k7:
-        st.metric("Risk Score", f"{metrics['risk_score']:.1f}/100")
-
-    st.markdown("---")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.plotly_chart(plot_portfolio_composition(df), use_container_width=True)
-    with c2:
-        st.plotly_chart(plot_risk_zones(df), use_container_width=True)
-
-    st.subheader("Profession & Collections")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.plotly_chart(plot_profession_repayment(df), use_container_width=True)
-    with c2:
-        st.plotly_chart(plot_payment_method_mix(df), use_container_width=True)
-
-    st.subheader("DPD & Exposure")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.plotly_chart(plot_dpd_distribution(df), use_container_width=True)
-    with c2:
-        st.plotly_chart(plot_emi_vs_loan(df), use_container_width=True)
-
-    st.subheader("Legal, Visits & Irregular Reasons")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.plotly_chart(plot_legal_vs_segment(df), use_container_width=True)
-    with c2:
-        st.plotly_chart(plot_visit_coverage(df), use_container_width=True)
-    st.plotly_chart(plot_irregular_reasons(df), use_container_width=True)
-
-    st.markdown("---")
-    st.subheader("Data & Export")
-
-    if st.checkbox("Show raw data", False):
-        st.dataframe(df, use_container_width=True, height=350)
-
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "Download current dataset (CSV)",
-        data=csv_bytes,
-        file_name=f"msme_portfolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv",
-    )
-
-    # Quick summary at the end
-    st.markdown("---")
-    st.subheader("Quick Summary")
-    st.markdown(
-        f"""
-- The **portfolio risk score** shows the overall health of the MSME book; higher values mean more stress in NPAs and upcoming NPAs.
-- **Current NPA** and **upcoming NPA percentages** highlight how many customers are already defaulted and how many are at high risk of slipping into NPA soon.  
-- **Profession-wise payment behavior** compares salaried, self-employed, and business customers so you can see which segment is driving most of the risk  
-- **Irregular payment reasons, legal notices, and visit coverage** explain whether problems come from customer stress, fraud/process gaps, or weak collection follow-up.  
-- **Payment method mix (cash vs digital)** shows operational risk and audit trail strength, supporting decisions to push more digital collections
-"""
-    )
-
-
-if __name__ == "__main__":
-    main()
-
-
-
-
+
+from datetime import datetime
+import hashlib
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+
+# PAGE CONFIG
+
+
+st.set_page_config(
+    page_title="MSME Loan Portfolio Dashboard",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+# Every chart on the dashboard renders at the same height; carrying it
+# in a template beats repeating update_layout(height=400) per figure.
+pio.templates["msme"] = go.layout.Template(layout={"height": 400})
+pio.templates.default = "plotly+msme"
+
+
+
+# STATUS MAPPINGS
+
+_ZONE_MAP = {
+    "Regular": "Green",
+    "Monitored": "Yellow",
+    "Upcoming_NPA": "Orange",
+    "Current_NPA": "Red",
+}
+
+_SEGMENT_GROUP_MAP = {
+    "Regular": "Regular",
+    "Monitored": "Monitored",
+    "Upcoming_NPA": "Upcoming NPA",
+    "Current_NPA": "Current NPA",
+    "Unclassified": "Unclassified",
+}
+
+
+# COLOR PALETTES
+
+_SEGMENT_COLORS = {
+    "Healthy": "#2ecc71",
+    "Monitored": "#f1c40f",
+    "Upcoming_NPA": "#e67e22",
+    "Current_NPA": "#e74c3c",
+    "Unclassified": "#95a5a6",
+}
+
+_STATUS_COLORS = {
+    "Regular": "#2ecc71",
+    "Monitored": "#f1c40f",
+    "Upcoming_NPA": "#e67e22",
+    "Current_NPA": "#e74c3c",
+    "Unclassified": "#95a5a6",
+}
+
+_ZONE_COLORS = {
+    "Green": "#2ecc71",
+    "Yellow": "#f1c40f",
+    "Orange": "#e67e22",
+    "Red": "#e74c3c",
+    "Unclassified": "#95a5a6",
+}
+
+_PAYMENT_METHOD_COLORS = {"Cash": "#e67e22", "Digital": "#3498db"}
+
+# Columns the loader derives from status; not part of the upload, so
+# they are hidden from the raw-data view and the CSV export.
+_DERIVED_COLUMNS = ("risk_zone", "segment_group")
+
+# The derived keys are normalized to a fixed vocabulary, so they get
+# ordered categorical dtypes: groupby then works on integer codes and
+# grouped output comes back in risk order instead of alphabetically.
+_ZONE_DTYPE = pd.CategoricalDtype(
+    ["Green", "Yellow", "Orange", "Red", "Unclassified"], ordered=True
+)
+_SEGMENT_GROUP_DTYPE = pd.CategoricalDtype(
+    ["Regular", "Monitored", "Upcoming NPA", "Current NPA", "Unclassified"],
+    ordered=True,
+)
+
+
+# DATA LOADING
+
+_PARQUET_CACHE_DIR = Path(".cache")
+
+
+@st.cache_data(show_spinner=False)
+def _count_rows(raw: bytes) -> int:
+    # Data rows without parsing: newline count less the header line.
+    # (Quoted embedded newlines would overcount; this dataset has none.)
+    n = raw.count(b"\n")
+    if raw and not raw.endswith(b"\n"):
+        n += 1
+    return max(n - 1, 0)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_csv(raw: bytes, nrows: int | None = None) -> pd.DataFrame:
+    # Keyed on the upload bytes, so reruns (slider moves, checkbox
+    # clicks) reuse the parsed frame instead of re-reading the CSV.
+    # cache_resource skips per-access hashing/copying of the returned
+    # frame; callers must treat it as immutable (no in-place writes).
+    # A content-hashed Parquet copy on disk lets the same file skip CSV
+    # parsing entirely when re-uploaded in a later session.
+    cache_path = _PARQUET_CACHE_DIR / (
+        hashlib.blake2b(raw, digest_size=8).hexdigest() + ".parquet"
+    )
+    if cache_path.exists():
+        try:
+            df = pd.read_parquet(cache_path)
+            return df.head(nrows) if nrows is not None else df
+        except Exception:
+            pass  # corrupt or unreadable cache file; re-parse the CSV
+
+    df = pd.read_csv(io.BytesIO(raw), nrows=nrows)
+    # Low-cardinality label columns become category (groupby and
+    # value_counts then work on integer codes, not strings) and flag
+    # columns become bool, shrinking the frame at the same time.
+    df = df.astype(
+        {
+            "segment": "category",
+            "status": "category",
+            "profession": "category",
+            "payment_method": "category",
+            "irregular_reason": "category",
+            "payment_regular": "bool",
+            "got_legal_notice": "bool",
+            "visit_covered": "bool",
+        }
+    )
+
+    # Group keys shared by several charts, derived once per upload so
+    # no plot helper repeats the status mapping on its own.
+    df["risk_zone"] = (
+        df["status"].map(_ZONE_MAP).fillna("Unclassified").astype(_ZONE_DTYPE)
+    )
+    df["segment_group"] = (
+        df["status"]
+        .map(_SEGMENT_GROUP_MAP)
+        .fillna("Unclassified")
+        .astype(_SEGMENT_GROUP_DTYPE)
+    )
+
+    if nrows is None:
+        # Only a full parse is a faithful copy of the upload, so only
+        # then is the Parquet cache written.
+        try:
+            _PARQUET_CACHE_DIR.mkdir(exist_ok=True)
+            df.to_parquet(cache_path)
+        except Exception:
+            pass  # no parquet engine or read-only disk; best-effort
+
+    return df
+
+
+# METRICS
+
+def calculate_metrics(df: pd.DataFrame) -> dict:
+    total = len(df)
+    status_counts = df["status"].value_counts()
+    metrics = {
+        "total_customers": total,
+        "regular_customers": int(status_counts.get("Regular", 0)),
+        "monitored_customers": int(status_counts.get("Monitored", 0)),
+        "upcoming_npa_customers": int(status_counts.get("Upcoming_NPA", 0)),
+        "current_npa_customers": int(status_counts.get("Current_NPA", 0)),
+        "unclassified_customers": int(status_counts.get("Unclassified", 0)),
+    }
+
+    metrics["current_npa_pct"] = (
+        metrics["current_npa_customers"] / total * 100 if total else 0.0
+    )
+    metrics["upcoming_npa_pct"] = (
+        metrics["upcoming_npa_customers"] / total * 100 if total else 0.0
+    )
+    metrics["regular_payer_pct"] = (
+        metrics["regular_customers"] / total * 100 if total else 0.0
+    )
+
+    method_counts = df["payment_method"].value_counts()
+    metrics["digital_customers"] = int(method_counts.get("Digital", 0))
+    metrics["digital_adoption_pct"] = (
+        metrics["digital_customers"] / total * 100 if total else 0.0
+    )
+
+    metrics["visit_covered_customers"] = int(df["visit_covered"].sum())
+    metrics["visit_coverage_pct"] = (
+        metrics["visit_covered_customers"] / total * 100 if total else 0.0
+    )
+
+    if total:
+        loan_agg = df["loan_amount"].agg(["sum", "mean"])
+        metrics["total_loan_amount"] = float(loan_agg["sum"])
+        metrics["avg_loan_amount"] = float(loan_agg["mean"])
+    else:
+        metrics["total_loan_amount"] = 0.0
+        metrics["avg_loan_amount"] = 0.0
+
+    npa_rate = metrics["current_npa_pct"]
+    upcoming_npa_rate = metrics["upcoming_npa_pct"]
+    dpd_coverage_eff = metrics["visit_coverage_pct"]
+    collection_coverage = metrics["visit_coverage_pct"]
+
+    risk_score = (
+        (npa_rate / 100) * 40
+        + (upcoming_npa_rate / 100) * 60
+        + (100 - dpd_coverage_eff) / 100 * 15
+        + (100 - collection_coverage) / 100 * 15
+    )
+    metrics["risk_score"] = min(max(risk_score, 0), 100)
+
+    return metrics
+
+
+
+# PLOTS
+
+def plot_portfolio_composition(df: pd.DataFrame):
+    comp = (
+        df["segment"]
+        # reindex fixes the display order anyway, so skip the sort.
+        .value_counts(sort=False)
+        .reindex(
+            ["Healthy", "Monitored", "Upcoming_NPA", "Current_NPA", "Unclassified"],
+            fill_value=0,
+        )
+        .reset_index()
+    )
+    comp.columns = ["segment", "customers"]
+    comp["percentage"] = comp["customers"] / comp["customers"].sum() * 100
+
+    # go.Bar directly: px.bar would rebuild an internal frame and infer
+    # color groupings for what is a five-row aggregate.
+    fig = go.Figure(
+        go.Bar(
+            x=comp["segment"],
+            y=comp["customers"],
+            text=[f"{x:.1f}%" for x in comp["percentage"].to_numpy()],
+            textposition="outside",
+            marker_color=[
+                _SEGMENT_COLORS.get(s, "#95a5a6") for s in comp["segment"]
+            ],
+        )
+    )
+    fig.update_layout(
+        title="Portfolio Composition by Segment",
+        xaxis_title="Segment",
+        yaxis_title="Customers",
+    )
+    return fig
+
+
+def plot_risk_zones(df: pd.DataFrame):
+    agg = df["risk_zone"].value_counts().reset_index()
+    agg.columns = ["risk_zone", "customers"]
+
+    fig = px.pie(
+        agg,
+        names="risk_zone",
+        values="customers",
+        title="Risk Zone Distribution",
+        color="risk_zone",
+        color_discrete_map=_ZONE_COLORS,
+        hole=0.4,
+    )
+    return fig
+
+
+def plot_profession_repayment(df: pd.DataFrame):
+    stats = (
+        df["payment_regular"]
+        .astype("int8")
+        .groupby(df["profession"], observed=True, sort=False)
+        .mean()
+        .mul(100)
+        .rename("payment_rate_pct")
+        .reset_index()
+    )
+
+    fig = px.bar(
+        stats,
+        x="profession",
+        y="payment_rate_pct",
+        title="Repayment Performance by Profession",
+        labels={"profession": "Profession", "payment_rate_pct": "Payment Rate (%)"},
+        color="payment_rate_pct",
+        color_continuous_scale="RdYlGn",
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def plot_payment_method_mix(df: pd.DataFrame):
+    dist = df["payment_method"].value_counts().reset_index()
+    dist.columns = ["payment_method", "customers"]
+    dist["percentage"] = dist["customers"] / dist["customers"].sum() * 100
+
+    fig = go.Figure(
+        go.Bar(
+            x=dist["payment_method"],
+            y=dist["customers"],
+            text=[f"{x:.1f}%" for x in dist["percentage"].to_numpy()],
+            textposition="outside",
+            marker_color=[
+                _PAYMENT_METHOD_COLORS.get(m, "#95a5a6")
+                for m in dist["payment_method"]
+            ],
+        )
+    )
+    fig.update_layout(
+        title="Payment Method Mix (Cash vs Digital)",
+        xaxis_title="Payment Method",
+        yaxis_title="Customers",
+    )
+    return fig
+
+
+def plot_dpd_distribution(df: pd.DataFrame):
+    # Bin in NumPy and send ~30 bars instead of shipping every raw dpd
+    # value to the browser for px.histogram to bin client-side.
+    counts, edges = np.histogram(df["dpd"].to_numpy(), bins=30)
+    fig = go.Figure(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker_color="#9b59b6",
+        )
+    )
+    fig.update_layout(
+        title="DPD (Days Past Due) Distribution",
+        xaxis_title="Days Past Due",
+        yaxis_title="Customers",
+        bargap=0,
+    )
+    return fig
+
+
+_SCATTER_CAP = 20_000
+
+
+def plot_emi_vs_loan(df: pd.DataFrame):
+    plot_df = df
+    if len(df) > _SCATTER_CAP:
+        # Sampling within each status keeps every segment visible while
+        # capping how many markers get serialized to the browser.
+        plot_df = df.groupby("status", observed=True).sample(
+            frac=_SCATTER_CAP / len(df), random_state=0
+        )
+    fig = px.scatter(
+        plot_df,
+        x="paid_emis",
+        y="loan_amount",
+        color="status",
+        size="emi_amount",
+        title="EMI Collection vs Loan Amount",
+        labels={"paid_emis": "EMIs Paid", "loan_amount": "Loan Amount (₹)"},
+        color_discrete_map=_STATUS_COLORS,
+        render_mode="webgl",
+    )
+    return fig
+
+
+def plot_risk_score_gauge(risk_score: float):
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=risk_score,
+            title={"text": "Portfolio Risk Score"},
+            domain={"x": [0, 1], "y": [0, 1]},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "darkblue"},
+                "steps": [
+                    {"range": [0, 30], "color": "#2ecc71"},
+                    {"range": [30, 60], "color": "#f1c40f"},
+                    {"range": [60, 100], "color": "#e74c3c"},
+                ],
+                "threshold": {
+                    "line": {"color": "red", "width": 4},
+                    "thickness": 0.75,
+                    "value": 47.5,
+                },
+            },
+        )
+    )
+    return fig
+
+
+def _segment_stats(df: pd.DataFrame) -> pd.DataFrame:
+    # One grouped pass produces every per-segment rate the dashboard
+    # shows; the legal-notice and visit-coverage charts both render
+    # from this table instead of re-grouping.
+    return (
+        df.groupby("segment_group", observed=True)[
+            ["got_legal_notice", "visit_covered"]
+        ]
+        .mean()
+        .mul(100)
+        .rename(
+            columns={
+                "got_legal_notice": "legal_notice_pct",
+                "visit_covered": "visit_coverage_pct",
+            }
+        )
+        .reset_index()
+    )
+
+
+def plot_legal_vs_segment(stats: pd.DataFrame):
+    fig = px.bar(
+        stats,
+        x="segment_group",
+        y="legal_notice_pct",
+        title="Legal Notice Coverage by Segment",
+        labels={"segment_group": "Segment", "legal_notice_pct": "With Legal Notice (%)"},
+        color="legal_notice_pct",
+        color_continuous_scale="Blues",
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def plot_visit_coverage(stats: pd.DataFrame):
+    fig = px.bar(
+        stats,
+        x="segment_group",
+        y="visit_coverage_pct",
+        title="Collection Visit Coverage by Segment",
+        labels={"segment_group": "Segment", "visit_coverage_pct": "Visit Coverage (%)"},
+        color="visit_coverage_pct",
+        color_continuous_scale="Greens",
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def plot_irregular_reasons(df: pd.DataFrame):
+    reasons = df.loc[df["irregular_reason"] != "None", "irregular_reason"]
+    if reasons.empty:
+        return go.Figure()
+
+    agg = reasons.value_counts().reset_index()
+    agg.columns = ["reason", "cases"]
+    agg["percentage"] = agg["cases"] / agg["cases"].sum() * 100
+
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure(
+        go.Bar(
+            x=agg["reason"],
+            y=agg["cases"],
+            text=[f"{x:.1f}%" for x in agg["percentage"].to_numpy()],
+            textposition="outside",
+            marker_color=[palette[i % len(palette)] for i in range(len(agg))],
+        )
+    )
+    fig.update_layout(
+        title="Irregular Payment Reasons",
+        xaxis_title="Reason",
+        yaxis_title="Number of Cases",
+    )
+    return fig
+
+
+
+# DASHBOARD SECTIONS
+#
+# Each section is a fragment: a widget interaction inside one (e.g. the
+# raw-data checkbox) reruns just that section instead of the whole
+# script. Sidebar widgets still trigger a full rerun.
+
+@st.fragment
+def _kpi_section(metrics: dict):
+    st.subheader("Key Performance Indicators")
+    k1, k2, k3, k4, k5, k6, k7 = st.columns(7)
+    with k1:
+        st.metric("Total Customers", f"{metrics['total_customers']}")
+    with k2:
+        st.metric("Regular Payers", f"{metrics['regular_payer_pct']:.1f}%")
+    with k3:
+        st.metric("Current NPA %", f"{metrics['current_npa_pct']:.1f}%")
+    with k4:
+        st.metric("Upcoming NPA %", f"{metrics['upcoming_npa_pct']:.1f}%")
+    with k5:
+        st.metric("Visit Coverage", f"{metrics['visit_coverage_pct']:.1f}%")
+    with k6:
+        st.metric("Digital Adoption", f"{metrics['digital_adoption_pct']:.1f}%")
+    with k7:
+        st.metric("Risk Score", f"{metrics['risk_score']:.1f}/100")
+
+
+@st.fragment
+def _composition_section(df: pd.DataFrame):
+    c1, c2 = st.columns(2)
+    with c1:
+        st.plotly_chart(plot_portfolio_composition(df), use_container_width=True)
+    with c2:
+        st.plotly_chart(plot_risk_zones(df), use_container_width=True)
+
+
+@st.fragment
+def _profession_section(df: pd.DataFrame):
+    st.subheader("Profession & Collections")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.plotly_chart(plot_profession_repayment(df), use_container_width=True)
+    with c2:
+        st.plotly_chart(plot_payment_method_mix(df), use_container_width=True)
+
+
+@st.fragment
+def _exposure_section(df: pd.DataFrame):
+    st.subheader("DPD & Exposure")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.plotly_chart(plot_dpd_distribution(df), use_container_width=True)
+    with c2:
+        st.plotly_chart(plot_emi_vs_loan(df), use_container_width=True)
+
+
+@st.fragment
+def _collections_section(df: pd.DataFrame):
+    st.subheader("Legal, Visits & Irregular Reasons")
+    seg_stats = _segment_stats(df)
+    c1, c2 = st.columns(2)
+    with c1:
+        st.plotly_chart(plot_legal_vs_segment(seg_stats), use_container_width=True)
+    with c2:
+        st.plotly_chart(plot_visit_coverage(seg_stats), use_container_width=True)
+    st.plotly_chart(plot_irregular_reasons(df), use_container_width=True)
+
+
+@st.fragment
+def _data_export_section(df: pd.DataFrame):
+    st.subheader("Data & Export")
+
+    upload_columns = [c for c in df.columns if c not in _DERIVED_COLUMNS]
+
+    if st.checkbox("Show raw data", False):
+        st.dataframe(df[upload_columns], use_container_width=True, height=350)
+
+    # Encode straight into a bytes buffer instead of building the full
+    # CSV as a str and then encoding a second copy of it.
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8", columns=upload_columns)
+    csv_bytes = buf.getvalue()
+    st.download_button(
+        "Download current dataset (CSV)",
+        data=csv_bytes,
+        file_name=f"msme_portfolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+    )
+
+
+# MAIN
+
+def main():
+    st.sidebar.title("📁 Data Source")
+
+    uploaded = st.sidebar.file_uploader(
+        "Upload MSME portfolio CSV ",
+        type=["csv"],
+    )
+    st.sidebar.link_button("Download Dataset from GitHub", "https://github.com/krishnachandan2412/MSME_Loan_Portfolio/blob/main/msme_loan_portfolio.csv")
+    if uploaded is None:
+        st.warning("Please upload a CSV file to view the dashboard.")
+        st.stop()
+
+    # Row slider in sidebar
+    raw = uploaded.getvalue()
+    max_rows = _count_rows(raw)
+    row_limit = st.sidebar.slider(
+        "Rows to use for analysis",
+        min_value=100 if max_rows >= 100 else 1,
+        max_value=max_rows,
+        value=max_rows,
+        step=50 if max_rows >= 150 else 1,
+    )
+    # Rows past the limit are never parsed or held in memory.
+    df = _load_csv(raw, row_limit if row_limit < max_rows else None)
+    st.sidebar.info(f"Using first {row_limit} rows out of {max_rows}")
+
+    metrics = calculate_metrics(df)
+
+    st.title("📊 MSME Loan Portfolio - Executive Dashboard")
+    st.write(
+        f"Report generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+
+    _kpi_section(metrics)
+
+    st.markdown("---")
+    _composition_section(df)
+    _profession_section(df)
+    _exposure_section(df)
+    _collections_section(df)
+
+    st.markdown("---")
+    _data_export_section(df)
+
+    # Quick summary at the end
+    st.markdown("---")
+    st.subheader("Quick Summary")
+    st.markdown(
+        f"""
+- The **portfolio risk score** shows the overall health of the MSME book; higher values mean more stress in NPAs and upcoming NPAs.
+- **Current NPA** and **upcoming NPA percentages** highlight how many customers are already defaulted and how many are at high risk of slipping into NPA soon.  
+- **Profession-wise payment behavior** compares salaried, self-employed, and business customers so you can see which segment is driving most of the risk  
+- **Irregular payment reasons, legal notices, and visit coverage** explain whether problems come from customer stress, fraud/process gaps, or weak collection follow-up.  
+- **Payment method mix (cash vs digital)** shows operational risk and audit trail strength, supporting decisions to push more digital collections
+"""
+    )
+
+
+if __name__ == "__main__":
+    main()
+
+
+
+